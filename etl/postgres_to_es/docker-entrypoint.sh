@@ -7,11 +7,27 @@ etl()
     python main.py
 }
 
+backfill()
+{
+    python backfill.py
+}
+
+replay()
+{
+    python replay_dead_letter.py
+}
+
 
 case "$RUN_CMD" in
     "etl")
         etl
         ;;
+    "backfill")
+        backfill
+        ;;
+    "replay")
+        replay
+        ;;
     "")
         echo "No command provided"
         exit 1
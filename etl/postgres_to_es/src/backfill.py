@@ -0,0 +1,41 @@
+import logging
+import sys
+
+from config.settings import (
+    postgres_settings,
+    elasticsearch_settings,
+    state_settings,
+    dead_letter_settings,
+    app_settings,
+)
+from dead_letter import create_dead_letter_queue
+from elasticsearch_loader import ElasticsearchLoader
+from postgres_fetcher import PostgresFetcher
+from transform import transform_to_json
+
+
+logging.basicConfig(level=app_settings.log_level.upper())
+logger = logging.getLogger(__name__)
+
+if __name__ == "__main__":
+    logger.info("Backfill started")
+    pg_fetcher = PostgresFetcher(postgres_settings)
+    dead_letter_queue = create_dead_letter_queue(
+        dead_letter_settings, state_settings.redis_storage
+    )
+    es_loader = ElasticsearchLoader(elasticsearch_settings, dead_letter_queue)
+    pg_fetcher.connect()
+
+    films = 0
+    # Aggregated rows are streamed with binary COPY and loaded chunk by chunk
+    for chunk in pg_fetcher.copy_film_data(app_settings.backfill_chunk_size):
+        transformed_data = transform_to_json(chunk)
+        if not es_loader.load_data(elasticsearch_settings.index, transformed_data):
+            logger.error("Backfill stopped after %d films", films)
+            pg_fetcher.close()
+            sys.exit(1)
+        films += len(transformed_data)
+        logger.info("Backfilled %d films", films)
+
+    pg_fetcher.close()
+    logger.info("Backfill finished")
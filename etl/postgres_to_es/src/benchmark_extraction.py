@@ -0,0 +1,289 @@
+"""
+Compares the cursor and the binary COPY extraction of aggregated film rows.
+
+Both paths run the same ordered full-catalog query and feed the transformer
+in chunks; only the way rows reach Python differs. Every run happens in a
+fresh process and the order of the paths alternates between rounds, so
+neither path always benefits from a warm cache.
+
+Seed an empty database (e.g. 100k films with 8 persons and 2 genres each,
+i.e. a million links), then run the benchmark, with the usual PG_* settings:
+
+    python benchmark_extraction.py seed --films 100000
+    python benchmark_extraction.py run --rounds 3 --chunk-size 1000
+"""
+import argparse
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+
+from config.settings import postgres_settings, app_settings
+from postgres_fetcher import FILM_DATA_COLUMNS, FILM_DATA_JOINS, PostgresFetcher
+from transform import transform_to_json
+
+
+logging.basicConfig(level=app_settings.log_level.upper())
+logger = logging.getLogger(__name__)
+
+PATHS = ("cursor", "copy")
+
+SCHEMA = """
+CREATE SCHEMA IF NOT EXISTS content;
+CREATE TABLE IF NOT EXISTS content.film_work (
+    id uuid PRIMARY KEY,
+    title text NOT NULL,
+    description text,
+    creation_date date,
+    rating float,
+    type text NOT NULL,
+    created_at timestamptz,
+    updated_at timestamptz
+);
+CREATE TABLE IF NOT EXISTS content.person (
+    id uuid PRIMARY KEY,
+    full_name text NOT NULL,
+    created_at timestamptz,
+    updated_at timestamptz
+);
+CREATE TABLE IF NOT EXISTS content.genre (
+    id uuid PRIMARY KEY,
+    name text NOT NULL,
+    description text,
+    created_at timestamptz,
+    updated_at timestamptz
+);
+CREATE TABLE IF NOT EXISTS content.person_film_work (
+    id uuid PRIMARY KEY,
+    film_work_id uuid NOT NULL REFERENCES content.film_work (id),
+    person_id uuid NOT NULL REFERENCES content.person (id),
+    role text NOT NULL,
+    created_at timestamptz
+);
+CREATE TABLE IF NOT EXISTS content.genre_film_work (
+    id uuid PRIMARY KEY,
+    film_work_id uuid NOT NULL REFERENCES content.film_work (id),
+    genre_id uuid NOT NULL REFERENCES content.genre (id),
+    created_at timestamptz
+);
+"""
+
+
+def seed(pg_fetcher: PostgresFetcher, films: int, persons_per_film: int) -> None:
+    """
+    Fills an empty database with generated films, persons, genres and links.
+
+    Args:
+        pg_fetcher (PostgresFetcher): A connected fetcher.
+        films (int): Number of films to generate.
+        persons_per_film (int): Number of person links per film; every film gets 2 genres.
+    """
+    pg_fetcher.execute_query(SCHEMA)
+    pg_fetcher.execute_query("SELECT count(*) AS films FROM content.film_work;")
+    if pg_fetcher.cursor.fetchone().films:
+        raise SystemExit("content.film_work is not empty, refusing to seed it")
+    persons = max(films // 2, persons_per_film)
+    statements = [
+        (
+            """
+            INSERT INTO content.film_work
+            SELECT gen_random_uuid(), 'Film ' || i, repeat('Plot of film ' || i || '. ', 10),
+                   now()::date, (i %% 100) / 10.0, 'movie', now(), now()
+            FROM generate_series(1, %s) AS i;
+            """,
+            (films,),
+        ),
+        (
+            """
+            INSERT INTO content.person
+            SELECT gen_random_uuid(), 'Person ' || i, now(), now()
+            FROM generate_series(1, %s) AS i;
+            """,
+            (persons,),
+        ),
+        (
+            """
+            INSERT INTO content.genre
+            SELECT gen_random_uuid(), 'Genre ' || i, NULL, now(), now()
+            FROM generate_series(1, 20) AS i;
+            """,
+            None,
+        ),
+        (
+            """
+            WITH fw AS (SELECT id, row_number() OVER () AS n FROM content.film_work),
+                 p AS (SELECT id, row_number() OVER () AS n FROM content.person)
+            INSERT INTO content.person_film_work
+            SELECT gen_random_uuid(), fw.id, p.id,
+                   (ARRAY['actor', 'writer', 'director'])[1 + k %% 3], now()
+            FROM fw
+            CROSS JOIN generate_series(0, %s - 1) AS k
+            JOIN p ON p.n = 1 + (fw.n * 7 + k) %% %s;
+            """,
+            (persons_per_film, persons),
+        ),
+        (
+            """
+            WITH fw AS (SELECT id, row_number() OVER () AS n FROM content.film_work),
+                 g AS (SELECT id, row_number() OVER () AS n FROM content.genre)
+            INSERT INTO content.genre_film_work
+            SELECT gen_random_uuid(), fw.id, g.id, now()
+            FROM fw
+            CROSS JOIN generate_series(0, 1) AS k
+            JOIN g ON g.n = 1 + (fw.n + k) % 20;
+            """,
+            None,
+        ),
+        ("ANALYZE;", None),
+    ]
+    for query, params in statements:
+        pg_fetcher.execute_query(query, params)
+    pg_fetcher.conn.commit()
+    logger.info(
+        "Seeded %d films with %d links",
+        films,
+        films * (persons_per_film + 2),
+    )
+
+
+def cursor_chunks(pg_fetcher: PostgresFetcher, chunk_size: int) -> Iterator[list]:
+    """
+    Extracts all films through the cursor with named tuple rows.
+
+    Args:
+        pg_fetcher (PostgresFetcher): A connected fetcher.
+        chunk_size (int): Maximum number of films per chunk.
+
+    Yields:
+        list: Rows of aggregated film data.
+    """
+    pg_fetcher.execute_query(
+        f"SELECT {FILM_DATA_COLUMNS} {FILM_DATA_JOINS} ORDER BY fw.id;"
+    )
+    chunk: list = []
+    films = 0
+    last_film_id = None
+    for row in pg_fetcher.cursor.fetchall():
+        if row.fw_id != last_film_id:
+            if films == chunk_size:
+                yield chunk
+                chunk, films = [], 0
+            films += 1
+            last_film_id = row.fw_id
+        chunk.append(row)
+    if chunk:
+        yield chunk
+
+
+def measure(pg_fetcher: PostgresFetcher, path: str, chunk_size: int) -> dict:
+    """
+    Extracts and transforms all films through one path.
+
+    Args:
+        pg_fetcher (PostgresFetcher): A connected fetcher.
+        path (str): "cursor" or "copy".
+        chunk_size (int): Maximum number of films per chunk.
+
+    Returns:
+        dict: Rows, films, wall and CPU seconds of the run, and the CPU seconds
+        spent in the transformer, which is the same for both paths.
+    """
+    extract = cursor_chunks if path == "cursor" else PostgresFetcher.copy_film_data
+    rows = films = 0
+    transform_cpu = 0.0
+    wall_started, cpu_started = time.perf_counter(), time.process_time()
+    for chunk in extract(pg_fetcher, chunk_size):
+        rows += len(chunk)
+        transform_started = time.process_time()
+        films += len(transform_to_json(chunk))
+        transform_cpu += time.process_time() - transform_started
+    return {
+        "path": path,
+        "rows": rows,
+        "films": films,
+        "wall": time.perf_counter() - wall_started,
+        "cpu": time.process_time() - cpu_started,
+        "transform_cpu": transform_cpu,
+    }
+
+
+def run(rounds: int, chunk_size: int) -> None:
+    """
+    Runs every path in a fresh process, alternating their order, and logs the medians.
+
+    Args:
+        rounds (int): Number of runs per path.
+        chunk_size (int): Maximum number of films per chunk.
+    """
+    results: dict[str, list[dict]] = {path: [] for path in PATHS}
+    for round_number in range(rounds):
+        order = PATHS if round_number % 2 == 0 else PATHS[::-1]
+        for path in order:
+            output = subprocess.run(
+                [sys.executable, __file__, "measure", path]
+                + ["--chunk-size", str(chunk_size)],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output)
+            results[path].append(result)
+            logger.info(
+                "round %d, %s: %.0f rows/sec, %.2fs wall, %.2fs CPU (%.2fs extraction)",
+                round_number + 1,
+                path,
+                result["rows"] / result["wall"],
+                result["wall"],
+                result["cpu"],
+                result["cpu"] - result["transform_cpu"],
+            )
+    for path, runs in results.items():
+        wall = statistics.median(result["wall"] for result in runs)
+        cpu = statistics.median(result["cpu"] for result in runs)
+        extraction_cpu = statistics.median(
+            result["cpu"] - result["transform_cpu"] for result in runs
+        )
+        logger.info(
+            "%s median: %d rows, %d films, %.0f rows/sec, %.2fs wall, "
+            "%.2fs CPU (%.2fs extraction)",
+            path,
+            runs[0]["rows"],
+            runs[0]["films"],
+            runs[0]["rows"] / wall,
+            wall,
+            cpu,
+            extraction_cpu,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    seed_parser = commands.add_parser("seed", help="fill an empty database")
+    seed_parser.add_argument("--films", type=int, default=100000)
+    seed_parser.add_argument("--persons-per-film", type=int, default=8)
+    run_parser = commands.add_parser("run", help="compare both paths")
+    run_parser.add_argument("--rounds", type=int, default=3)
+    run_parser.add_argument("--chunk-size", type=int, default=1000)
+    measure_parser = commands.add_parser("measure", help="measure one path")
+    measure_parser.add_argument("path", choices=PATHS)
+    measure_parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        run(args.rounds, args.chunk_size)
+    else:
+        pg_fetcher = PostgresFetcher(postgres_settings)
+        pg_fetcher.connect()
+        if args.command == "seed":
+            seed(pg_fetcher, args.films, args.persons_per_film)
+        else:
+            sys.stdout.write(
+                json.dumps(measure(pg_fetcher, args.path, args.chunk_size)) + "\n"
+            )
+        pg_fetcher.close()
@@ -0,0 +1,112 @@
+import logging
+import time
+from itertools import islice
+
+from config.settings import app_settings
+
+logging.basicConfig(level=app_settings.log_level.upper())
+logger = logging.getLogger(__name__)
+
+
+class ChangeBuffer:
+    """
+    Class to coalesce changed film work IDs between change detection and loading.
+
+    IDs coming from the film work, person and genre streams are deduplicated
+    over a short window, so a film saved many times in a row is built and
+    indexed once per window. The watermarks of the buffered changes are kept
+    aside and handed out only when the buffer is emptied, so they can be
+    committed after all the films read up to them have been loaded.
+
+    Attributes:
+        window (float): Maximum age of the buffer in seconds before it is flushed.
+        max_size (int): Number of distinct film work IDs that forces a flush.
+        film_work_ids (dict): Distinct film work IDs waiting to be loaded, oldest first.
+        watermarks (dict): Latest watermark per state key for the buffered changes.
+    """
+
+    def __init__(self, window: float, max_size: int) -> None:
+        """
+        Initializes the ChangeBuffer with the flush limits.
+
+        Args:
+            window (float): Maximum age of the buffer in seconds before it is flushed.
+            max_size (int): Number of distinct film work IDs that forces a flush.
+        """
+        self.window = window
+        self.max_size = max_size
+        self.film_work_ids: dict = {}
+        self.watermarks: dict[str, str] = {}
+        self.opened_at: float | None = None
+
+    def add(self, film_work_ids: list, watermarks: dict[str, str | None]) -> None:
+        """
+        Adds changed film work IDs and the watermarks they were read up to.
+
+        Args:
+            film_work_ids (list): Changed film work IDs.
+            watermarks (dict): New watermark per state key, None if the stream had no changes.
+        """
+        watermarks = {key: value for key, value in watermarks.items() if value}
+        if not film_work_ids and not watermarks:
+            return
+        if self.opened_at is None:
+            self.opened_at = time.monotonic()
+        self.film_work_ids.update(dict.fromkeys(film_work_ids))
+        self.watermarks.update(watermarks)
+
+    def get_watermark(self, key: str) -> str | None:
+        """
+        Returns the buffered watermark for a stream, if it has not been flushed yet.
+
+        Args:
+            key (str): The state key of the stream.
+
+        Returns:
+            str | None: The buffered watermark.
+        """
+        return self.watermarks.get(key)
+
+    def is_ready(self) -> bool:
+        """
+        Checks whether the buffer should be flushed.
+
+        Returns:
+            bool: True if the buffer is full or older than the window.
+        """
+        if self.opened_at is None:
+            return False
+        return (
+            len(self.film_work_ids) >= self.max_size
+            or time.monotonic() - self.opened_at >= self.window
+        )
+
+    def drain(self, limit: int | None = None) -> tuple[list, dict[str, str]]:
+        """
+        Takes the oldest film work IDs out of the buffer.
+
+        Args:
+            limit (int, optional): Maximum number of IDs to take. All of them by default.
+
+        Returns:
+            tuple: The distinct film work IDs and the watermarks to commit after loading them.
+            Watermarks are only returned once the buffer is empty.
+        """
+        if limit is not None and limit < len(self.film_work_ids):
+            film_work_ids = list(islice(self.film_work_ids, limit))
+            for film_work_id in film_work_ids:
+                del self.film_work_ids[film_work_id]
+            return film_work_ids, {}
+        film_work_ids, watermarks = list(self.film_work_ids), self.watermarks
+        logger.debug(
+            "Flushing %d coalesced film works after %.2f seconds",
+            len(film_work_ids),
+            time.monotonic() - self.opened_at if self.opened_at else 0,
+        )
+        self.film_work_ids = {}
+        self.watermarks = {}
+        self.opened_at = None
+        return film_work_ids, watermarks
+
+    def __len__(self) -> int:
+        return len(self.film_work_ids)
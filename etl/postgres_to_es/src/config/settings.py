@@ -4,6 +4,13 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class AppSettings(BaseSettings):
     log_level: str = "INFO"
     batch_size: int = 100
+    poll_interval: float = 0.25
+    direct_window: float = 0.25
+    direct_batch_size: int = 1000
+    cascade_window: float = 2.0
+    cascade_batch_size: int = 100
+    cascade_rate_limit: float = 200.0
+    backfill_chunk_size: int = 1000
 
 
 class PostgresSettings(BaseSettings):
@@ -21,6 +28,16 @@ class ElasticsearchSettings(BaseSettings):
     port: int = 9200
     scheme: str = "http"
     index: str = "movies"
+    bulk_max_retries: int = 3
+    bulk_retry_delay: float = 0.1
+    hosts: list[str] = []
+    node_selector: str = "round_robin"
+    sniff_on_start: bool = False
+    sniff_on_node_failure: bool = False
+    connections_per_node: int = 10
+    http_compress: bool = True
+    request_timeout: float = 30.0
+    bulk_thread_count: int = 1
 
 
 class JsonFileStorageSettings(BaseSettings):
@@ -40,7 +57,28 @@ class StateSettings(BaseSettings):
     redis_storage: RedisStorageSettings = RedisStorageSettings()
 
 
+class DeadLetterSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="dlq_")
+    storage: str = "json"
+    path: str = "dead_letter.jsonl"
+    redis_key: str = "etl:dead_letter"
+    redis_db: int = 1
+    replay_batch_size: int = 100
+
+
+class ProfilingSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="profile_")
+    on_start: bool = False
+    on_signal: bool = True
+    iterations: int = 10
+    output_dir: str = "profiles"
+    spans: bool = False
+    memory_top: int = 25
+
+
 postgres_settings = PostgresSettings()
 elasticsearch_settings = ElasticsearchSettings()
 state_settings = StateSettings()
+dead_letter_settings = DeadLetterSettings()
+profiling_settings = ProfilingSettings()
 app_settings = AppSettings()
@@ -0,0 +1,309 @@
+import abc
+import fcntl
+import json
+import logging
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any
+
+from redis import Redis
+
+from config.settings import app_settings, DeadLetterSettings, RedisStorageSettings
+
+logging.basicConfig(level=app_settings.log_level.upper())
+logger = logging.getLogger(__name__)
+
+
+class BaseDeadLetterStorage(abc.ABC):
+    """
+    An abstract base class for dead-letter storages.
+    Defines methods for appending failed documents and draining them for replay.
+    Entries are read with peek_batch and removed with remove_batch only once
+    they have been replayed, so a failed replay leaves them in place.
+    """
+
+    @abc.abstractmethod
+    def push(self, entries: list[dict[str, Any]]) -> None:
+        """
+        Abstract method to append entries to the dead-letter storage.
+
+        Args:
+            entries (list): The dead-letter entries to be saved.
+        """
+        pass
+
+    @abc.abstractmethod
+    def peek_batch(self, size: int) -> list[dict[str, Any]]:
+        """
+        Abstract method to return the oldest entries without removing them.
+
+        Args:
+            size (int): Maximum number of entries to return.
+
+        Returns:
+            list: The oldest dead-letter entries.
+        """
+        pass
+
+    @abc.abstractmethod
+    def remove_batch(self, size: int) -> None:
+        """
+        Abstract method to remove the oldest entries.
+
+        Args:
+            size (int): Number of entries to remove.
+        """
+        pass
+
+    @abc.abstractmethod
+    def size(self) -> int:
+        """
+        Abstract method to count the stored entries.
+
+        Returns:
+            int: The number of entries waiting for replay.
+        """
+        pass
+
+
+class JsonLinesDeadLetterStorage(BaseDeadLetterStorage):
+    """
+    A concrete implementation of BaseDeadLetterStorage that keeps one JSON entry per line in a local file.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        """
+        Initializes the JsonLinesDeadLetterStorage with a file path.
+
+        Args:
+            file_path (str): Path to the JSON lines file used for storage.
+        """
+        self.file_path = file_path
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        # The data file is replaced on removal, so the lock lives in its own file
+        with open(f"{self.file_path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_all(self) -> list[dict[str, Any]]:
+        try:
+            with open(self.file_path, "r") as file:
+                return [json.loads(line) for line in file if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def push(self, entries: list[dict[str, Any]]) -> None:
+        """
+        Appends entries to the JSON lines file.
+
+        Args:
+            entries (list): The dead-letter entries to be saved.
+        """
+        with self._locked(), open(self.file_path, "a") as file:
+            for entry in entries:
+                file.write(json.dumps(entry, default=str) + "\n")
+
+    def peek_batch(self, size: int) -> list[dict[str, Any]]:
+        """
+        Returns the oldest entries from the JSON lines file without removing them.
+
+        Args:
+            size (int): Maximum number of entries to return.
+
+        Returns:
+            list: The oldest dead-letter entries.
+        """
+        with self._locked():
+            return self._read_all()[:size]
+
+    def remove_batch(self, size: int) -> None:
+        """
+        Removes the oldest entries from the JSON lines file.
+
+        Args:
+            size (int): Number of entries to remove.
+        """
+        with self._locked():
+            rest = self._read_all()[size:]
+            tmp_path = f"{self.file_path}.tmp"
+            with open(tmp_path, "w") as file:
+                for entry in rest:
+                    file.write(json.dumps(entry, default=str) + "\n")
+            os.replace(tmp_path, self.file_path)
+
+    def size(self) -> int:
+        """
+        Counts the entries in the JSON lines file.
+
+        Returns:
+            int: The number of entries waiting for replay.
+        """
+        with self._locked():
+            return len(self._read_all())
+
+
+class RedisDeadLetterStorage(BaseDeadLetterStorage):
+    """
+    A concrete implementation of BaseDeadLetterStorage that keeps entries in a Redis list.
+    """
+
+    def __init__(self, redis_adapter: Redis, key: str) -> None:
+        """
+        Initializes the RedisDeadLetterStorage with a Redis adapter.
+
+        Args:
+            redis_adapter (Redis): The Redis adapter for connecting to the Redis database.
+            key (str): Name of the Redis list holding the entries.
+        """
+        self.redis_adapter = redis_adapter
+        self.key = key
+
+    def push(self, entries: list[dict[str, Any]]) -> None:
+        """
+        Appends entries to the tail of the Redis list.
+
+        Args:
+            entries (list): The dead-letter entries to be saved.
+        """
+        if entries:
+            self.redis_adapter.rpush(
+                self.key, *(json.dumps(entry, default=str) for entry in entries)
+            )
+
+    def peek_batch(self, size: int) -> list[dict[str, Any]]:
+        """
+        Returns the oldest entries from the Redis list without removing them.
+
+        Args:
+            size (int): Maximum number of entries to return.
+
+        Returns:
+            list: The oldest dead-letter entries.
+        """
+        raw_entries = self.redis_adapter.lrange(self.key, 0, size - 1)
+        return [json.loads(raw_entry) for raw_entry in raw_entries]
+
+    def remove_batch(self, size: int) -> None:
+        """
+        Removes the oldest entries from the Redis list.
+
+        Args:
+            size (int): Number of entries to remove.
+        """
+        self.redis_adapter.ltrim(self.key, size, -1)
+
+    def size(self) -> int:
+        """
+        Counts the entries in the Redis list.
+
+        Returns:
+            int: The number of entries waiting for replay.
+        """
+        return self.redis_adapter.llen(self.key)
+
+
+class DeadLetterQueue:
+    """
+    Class to park documents that Elasticsearch permanently rejected, together with the reason.
+    """
+
+    def __init__(self, storage: BaseDeadLetterStorage) -> None:
+        """
+        Initializes the DeadLetterQueue with a specified storage mechanism.
+
+        Args:
+            storage (BaseDeadLetterStorage): The storage mechanism for dead-letter entries.
+        """
+        self.storage = storage
+
+    def put(
+        self,
+        index: str,
+        document: dict[str, Any],
+        reason: Any,
+        status: int | str | None = None,
+    ) -> None:
+        """
+        Saves a rejected document to the dead-letter storage.
+
+        Args:
+            index (str): The Elasticsearch index the document was meant for.
+            document (dict): The rejected document.
+            reason (Any): The error reported by Elasticsearch.
+            status (int | str, optional): The HTTP status of the failed item.
+        """
+        self.storage.push(
+            [
+                {
+                    "id": document["id"],
+                    "index": index,
+                    "status": status,
+                    "reason": reason,
+                    "failed_at": datetime.now(timezone.utc).isoformat(),
+                    "document": document,
+                }
+            ]
+        )
+        logger.warning(
+            "Document %s moved to dead-letter queue: %s", document["id"], reason
+        )
+
+    def peek(self, size: int) -> list[dict[str, Any]]:
+        """
+        Returns the oldest dead-letter entries without removing them.
+
+        Args:
+            size (int): Maximum number of entries to return.
+
+        Returns:
+            list: The oldest dead-letter entries.
+        """
+        return self.storage.peek_batch(size)
+
+    def ack(self, size: int) -> None:
+        """
+        Removes the oldest dead-letter entries once they have been replayed.
+
+        Args:
+            size (int): Number of entries to remove.
+        """
+        self.storage.remove_batch(size)
+
+    def __len__(self) -> int:
+        return self.storage.size()
+
+
+def create_dead_letter_queue(
+    dlq_config: DeadLetterSettings, redis_config: RedisStorageSettings
+) -> DeadLetterQueue:
+    """
+    Builds the dead-letter queue for the configured storage type.
+
+    Args:
+        dlq_config (DeadLetterSettings): The dead-letter queue configuration.
+        redis_config (RedisStorageSettings): The Redis server used by the "redis" storage.
+
+    Returns:
+        DeadLetterQueue: The dead-letter queue.
+    """
+    if dlq_config.storage == "json":
+        return DeadLetterQueue(storage=JsonLinesDeadLetterStorage(dlq_config.path))
+    if dlq_config.storage == "redis":
+        return DeadLetterQueue(
+            storage=RedisDeadLetterStorage(
+                Redis(
+                    host=redis_config.host,
+                    port=redis_config.port,
+                    db=dlq_config.redis_db,
+                ),
+                dlq_config.redis_key,
+            )
+        )
+    raise ValueError("Unknown type of dead-letter storage")
@@ -1,11 +1,15 @@
 from elasticsearch import Elasticsearch, helpers
 import logging
+import time
 
 from config.settings import app_settings, ElasticsearchSettings
+from dead_letter import DeadLetterQueue
 
 logging.basicConfig(level=app_settings.log_level.upper())
 logger = logging.getLogger(__name__)
 
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
 
 class ElasticsearchLoader:
     """
@@ -14,47 +18,155 @@ class ElasticsearchLoader:
     This class uses the Elasticsearch client to index data.
     It supports both single and batch loading of data into Elasticsearch.
 
+    Documents rejected by Elasticsearch are classified per item: retryable
+    failures are sent again, permanent ones are moved to the dead-letter queue.
+
     Attributes:
         es (Elasticsearch): An instance of the Elasticsearch client.
+        dead_letter_queue (DeadLetterQueue): Storage for permanently rejected documents.
+        max_retries (int): How many times retryable failures are sent again.
+        retry_delay (float): Delay before the first retry in seconds, doubled for every next one.
+        thread_count (int): Number of threads sending bulk chunks in parallel.
     """
 
-    def __init__(self, es_config: ElasticsearchSettings):
+    def __init__(
+        self,
+        es_config: ElasticsearchSettings,
+        dead_letter_queue: DeadLetterQueue | None = None,
+    ):
         """
         Initializes ElasticsearchLoader with the configuration for the connection
 
         Args:
             es_config: Configuration for connecting to Elasticsearch.
+            dead_letter_queue: Storage for permanently rejected documents.
         """
+        self.dead_letter_queue = dead_letter_queue
+        self.max_retries = es_config.bulk_max_retries
+        self.retry_delay = es_config.bulk_retry_delay
+        self.thread_count = es_config.bulk_thread_count
         self.es = Elasticsearch(
-            hosts=[
+            hosts=es_config.hosts
+            or [
                 {
                     "host": es_config.host,
                     "port": es_config.port,
                     "scheme": es_config.scheme,
                 }
-            ]
+            ],
+            node_selector_class=es_config.node_selector,
+            sniff_on_start=es_config.sniff_on_start,
+            sniff_on_node_failure=es_config.sniff_on_node_failure,
+            connections_per_node=es_config.connections_per_node,
+            http_compress=es_config.http_compress,
+            request_timeout=es_config.request_timeout,
         )
 
-    def load_data(self, index: str, data: list) -> None:
+    def load_data(self, index: str, data: list) -> bool:
         """
         Loads data into Elasticsearch using batch processing.
 
         This method takes a list of data and indexes it in Elasticsearch.
-        Batch processing is used to increase performance.
+        Batch processing is used to increase performance. Documents failing
+        with a retryable status are sent again with an exponential delay,
+        documents failing permanently are moved to the dead-letter queue,
+        so the rest of the batch is not blocked. If retryable failures
+        persist after the last retry, or Elasticsearch cannot be reached,
+        nothing is dead-lettered and the whole batch has to be loaded again.
 
         Args:
             index (str): The name of the Elasticsearch index into which the data will be loaded.
             data (list): The list of data to be indexed.
+
+        Returns:
+            bool: True if every document was either loaded or dead-lettered,
+            False if the batch has to be loaded again.
         """
         try:
-            actions = [
-                {"_index": index, "_id": record["id"], "_source": record}
-                for record in data
-            ]
-            helpers.bulk(self.es, actions)
-            if len(actions) > 0:
-                logger.info(
-                    "Successfully loaded %d documents to Elasticsearch", len(actions)
+            pending = {str(record["id"]): record for record in data}
+            loaded = 0
+            rejected = []
+            for attempt in range(self.max_retries + 1):
+                if not pending:
+                    break
+                if attempt > 0:
+                    time.sleep(self.retry_delay * (2 ** (attempt - 1)))
+                    logger.warning(
+                        "Retrying %d documents, attempt %d", len(pending), attempt
+                    )
+                success, errors = self._bulk(index, pending.values())
+                loaded += success
+                retryable = {}
+                for error in errors:
+                    doc_id, status, reason = self._parse_error(error)
+                    record = pending.get(doc_id)
+                    if record is None:
+                        # Keep whatever the error item carries rather than losing it
+                        item = next(iter(error.values()))
+                        record = item.get("data") or {"id": doc_id}
+                        rejected.append((record, reason, status))
+                    elif status in RETRYABLE_STATUSES:
+                        retryable[doc_id] = record
+                    else:
+                        rejected.append((record, reason, status))
+                pending = retryable
+            if pending:
+                # Rejections are dead-lettered when the batch is loaded again
+                logger.error(
+                    "%d documents still rejected with a retryable status, "
+                    "the batch will be loaded again",
+                    len(pending),
                 )
+                return False
         except Exception as e:
             logger.error("Failed to bulk index documents: %s", e)
+            return False
+        for record, reason, status in rejected:
+            self._dead_letter(index, record, reason, status)
+        if loaded > 0:
+            logger.info("Successfully loaded %d documents to Elasticsearch", loaded)
+        return True
+
+    def _bulk(self, index: str, records) -> tuple[int, list]:
+        actions = [
+            {"_index": index, "_id": record["id"], "_source": record}
+            for record in records
+        ]
+        if self.thread_count <= 1:
+            return helpers.bulk(
+                self.es, actions, raise_on_error=False, raise_on_exception=False
+            )
+        success, errors = 0, []
+        for ok, item in helpers.parallel_bulk(
+            self.es,
+            actions,
+            thread_count=self.thread_count,
+            raise_on_error=False,
+            raise_on_exception=False,
+        ):
+            if ok:
+                success += 1
+            else:
+                errors.append(item)
+        return success, errors
+
+    @staticmethod
+    def _parse_error(error: dict) -> tuple:
+        """
+        Extracts the document id, HTTP status and reason from a bulk error item.
+
+        Args:
+            error (dict): A failed bulk item as returned by the bulk helper.
+
+        Returns:
+            tuple: The document id as a string, the status and the error reason.
+        """
+        item = next(iter(error.values()))
+        # Errors of a failed request echo the action header, whose _id is not a string
+        return str(item.get("_id")), item.get("status"), item.get("error")
+
+    def _dead_letter(self, index: str, record: dict, reason, status) -> None:
+        if self.dead_letter_queue is None:
+            logger.error("Failed to index document %s: %s", record["id"], reason)
+            return
+        self.dead_letter_queue.put(index, record, reason, status)
@@ -0,0 +1,164 @@
+import logging
+import time
+from datetime import datetime
+
+from change_buffer import ChangeBuffer
+from config.settings import app_settings
+
+logging.basicConfig(level=app_settings.log_level.upper())
+logger = logging.getLogger(__name__)
+
+
+class Lane:
+    """
+    A scheduling lane with its own change buffer, batch budget and watermarks.
+
+    Each flush loads at most batch_size films. When a rate limit is set,
+    the next flush is delayed so that the lane does not load more than
+    rate_limit films per second on average. A batch that was taken but not
+    confirmed with done() is put back before the next one is taken, together
+    with the watermarks it was meant to commit, so a failed load is retried.
+
+    Lag is measured from the updated_at of the oldest change the lane has
+    not committed yet, so it keeps growing while a backlog holds back the
+    watermarks, including changes not read from PostgreSQL yet. It is
+    logged per lane after every flush.
+
+    Attributes:
+        name (str): Name of the lane used in logs.
+        buffer (ChangeBuffer): Changed film work IDs waiting to be loaded.
+        batch_size (int): Maximum number of films loaded per flush.
+        rate_limit (float): Maximum films per second, 0 for no limit.
+        lag (float): Lag of the last flush in seconds.
+    """
+
+    def __init__(
+        self, name: str, window: float, batch_size: int, rate_limit: float = 0.0
+    ) -> None:
+        """
+        Initializes the Lane with its budgets.
+
+        Args:
+            name (str): Name of the lane used in logs.
+            window (float): Coalescing window of the lane in seconds.
+            batch_size (int): Maximum number of films loaded per flush.
+            rate_limit (float): Maximum films per second, 0 for no limit.
+        """
+        self.name = name
+        self.buffer = ChangeBuffer(window=window, max_size=batch_size)
+        self.batch_size = batch_size
+        self.rate_limit = rate_limit
+        self.lag = 0.0
+        self._next_flush_at = 0.0
+        self._oldest_change: datetime | None = None
+        self._flush_oldest_change: datetime | None = None
+        self._in_flight: list = []
+        self._in_flight_watermarks: dict[str, str] = {}
+
+    @property
+    def backlog(self) -> int:
+        return len(self.buffer)
+
+    def get_watermark(self, key: str) -> str | None:
+        """
+        Returns the watermark the lane has read a stream up to.
+
+        Args:
+            key (str): The state key of the stream.
+
+        Returns:
+            str | None: The watermark, if the lane holds unflushed changes of the stream.
+        """
+        return self.buffer.get_watermark(key)
+
+    def add(
+        self,
+        film_work_ids: list,
+        watermarks: dict[str, str | None],
+        changed_at: list[datetime],
+    ) -> None:
+        """
+        Queues changed film work IDs in the lane.
+
+        Args:
+            film_work_ids (list): Changed film work IDs.
+            watermarks (dict): New watermark per state key, None if the stream had no changes.
+            changed_at (list): updated_at of the source records the IDs were derived from.
+        """
+        self.buffer.add(film_work_ids, watermarks)
+        self._track_oldest_change(changed_at)
+
+    def _track_oldest_change(self, changed_at: list) -> None:
+        changed_at = [moment for moment in changed_at if moment is not None]
+        if self._oldest_change is not None:
+            changed_at.append(self._oldest_change)
+        if changed_at:
+            self._oldest_change = min(changed_at)
+
+    def is_ready(self) -> bool:
+        """
+        Checks whether the lane should be flushed now.
+
+        Returns:
+            bool: True if the buffer is ready or a failed batch waits for a retry,
+            and the rate limit allows a flush.
+        """
+        return (
+            bool(self._in_flight) or self.buffer.is_ready()
+        ) and time.monotonic() >= self._next_flush_at
+
+    def take(self) -> tuple[list, dict[str, str]]:
+        """
+        Takes the next batch of the lane.
+
+        Returns:
+            tuple: Up to batch_size film work IDs and the watermarks to commit after loading them.
+        """
+        if self._in_flight:
+            logger.warning(
+                "%s lane: requeueing %d films of a failed batch",
+                self.name,
+                len(self._in_flight),
+            )
+            # Watermarks read since then are newer than the failed batch's
+            self.buffer.add(
+                self._in_flight,
+                {
+                    key: value
+                    for key, value in self._in_flight_watermarks.items()
+                    if self.buffer.get_watermark(key) is None
+                },
+            )
+            self._track_oldest_change([self._flush_oldest_change])
+        self._flush_oldest_change = self._oldest_change
+        film_work_ids, watermarks = self.buffer.drain(self.batch_size)
+        if not self.backlog:
+            # The watermarks are committed with this batch
+            self._oldest_change = None
+        self._in_flight = film_work_ids
+        self._in_flight_watermarks = watermarks
+        if self.rate_limit > 0:
+            self._next_flush_at = (
+                time.monotonic() + len(film_work_ids) / self.rate_limit
+            )
+        return film_work_ids, watermarks
+
+    def done(self, loaded: int) -> None:
+        """
+        Confirms the batch taken last and logs its lag.
+
+        Args:
+            loaded (int): Number of films loaded from the batch.
+        """
+        self._in_flight = []
+        self._in_flight_watermarks = {}
+        if self._flush_oldest_change is not None:
+            oldest = self._flush_oldest_change
+            self.lag = (datetime.now(oldest.tzinfo) - oldest).total_seconds()
+        logger.info(
+            "%s lane: loaded %d films, lag %.2fs, backlog %d",
+            self.name,
+            loaded,
+            self.lag,
+            self.backlog,
+        )
@@ -7,17 +7,64 @@ from config.settings import (
     postgres_settings,
     elasticsearch_settings,
     state_settings,
+    dead_letter_settings,
+    profiling_settings,
     app_settings,
 )
+from dead_letter import create_dead_letter_queue
 from elasticsearch_loader import ElasticsearchLoader
+from lanes import Lane
 from state_manager import State, JsonFileStorage, RedisStorage
 from postgres_fetcher import PostgresFetcher
+from profiling import Profiler
 from transform import transform_to_json
 
 
 logging.basicConfig(level=app_settings.log_level.upper())
 logger = logging.getLogger(__name__)
 
+
+def flush_lane(
+    lane: Lane,
+    pg_fetcher: PostgresFetcher,
+    es_loader: ElasticsearchLoader,
+    state_manager: State,
+    profiler: Profiler,
+    index: str,
+) -> None:
+    """
+    Loads the next batch of a lane and commits its watermarks.
+
+    If the batch cannot be loaded, nothing is committed and the batch stays
+    in flight, so the lane takes it again on its next flush.
+
+    Args:
+        lane (Lane): The lane to flush.
+        pg_fetcher (PostgresFetcher): A connected fetcher.
+        es_loader (ElasticsearchLoader): The loader for the index.
+        state_manager (State): The state holding the watermarks.
+        profiler (Profiler): The profiler measuring the steps.
+        index (str): The name of the Elasticsearch index.
+
+    Raises:
+        RuntimeError: If the batch was not loaded.
+    """
+    film_work_ids, watermarks = lane.take()
+    with profiler.span(f"{lane.name}.merge_film_data", trace_memory=True):
+        complete_film_data = pg_fetcher.merge_film_data(film_work_ids)
+    # Transform and load data
+    with profiler.span(f"{lane.name}.transform_to_json", trace_memory=True):
+        transformed_data = transform_to_json(complete_film_data)
+    with profiler.span(f"{lane.name}.load_data"):
+        loaded = es_loader.load_data(index, transformed_data)
+    if not loaded:
+        raise RuntimeError(f"{lane.name} lane: batch was not loaded")
+    # Commit watermarks only after the lane's films are loaded
+    for key, value in watermarks.items():
+        state_manager.set_state(key, value)
+    lane.done(len(transformed_data))
+
+
 if __name__ == "__main__":
     logger.info("ETL process initialising...")
     pg_config = postgres_settings
@@ -29,16 +76,33 @@ if __name__ == "__main__":
         state_manager = State(
             storage=RedisStorage(
                 Redis(
-                    host=state_settings.redis.host,
-                    port=state_settings.redis.port,
-                    db=state_settings.redis.db,
+                    host=state_settings.redis_storage.host,
+                    port=state_settings.redis_storage.port,
+                    db=state_settings.redis_storage.db,
                 )
             )
         )
     else:
         raise ValueError("Unknown type of state storage")
     pg_fetcher = PostgresFetcher(pg_config)
-    es_loader = ElasticsearchLoader(es_config)
+    dead_letter_queue = create_dead_letter_queue(
+        dead_letter_settings, state_settings.redis_storage
+    )
+    es_loader = ElasticsearchLoader(es_config, dead_letter_queue)
+    # Direct film edits and films pulled in by person/genre changes are
+    # scheduled separately, so mass cascades cannot delay direct edits
+    direct_lane = Lane(
+        "direct",
+        window=app_settings.direct_window,
+        batch_size=app_settings.direct_batch_size,
+    )
+    cascade_lane = Lane(
+        "cascade",
+        window=app_settings.cascade_window,
+        batch_size=app_settings.cascade_batch_size,
+        rate_limit=app_settings.cascade_rate_limit,
+    )
+    profiler = Profiler(profiling_settings)
     pg_fetcher.connect()
     last_modified_person = state_manager.get_state("person_last_modified")
     last_modified_genre = state_manager.get_state("genre_last_modified")
@@ -47,62 +111,79 @@ if __name__ == "__main__":
 
     while True:
         try:
-            # Fetch updated records for person, genre and film work
-            last_modified_person = state_manager.get_state("person_last_modified")
-            (
-                updated_persons_data,
-                new_last_modified_person,
-            ) = pg_fetcher.fetch_updated_records("person", last_modified_person)
-            person_ids = [row[0] for row in updated_persons_data]
-            # Fetch updated records for genre
-            last_modified_genre = state_manager.get_state("genre_last_modified")
-            (
-                updated_genres_data,
-                new_last_modified_genre,
-            ) = pg_fetcher.fetch_updated_records("genre", last_modified_genre)
-            genre_ids = [row[0] for row in updated_genres_data]
-            # Fetch updated records for film work
-            last_modified_film_work = state_manager.get_state("film_work_last_modified")
-            (
-                updated_film_works_data,
-                new_last_modified_film_work,
-            ) = pg_fetcher.fetch_updated_records("film_work", last_modified_film_work)
-            film_work_ids = [row[0] for row in updated_film_works_data]
-            # Additional related movies by person and genre
-            additional_films_by_person = pg_fetcher.fetch_films_by_updated_persons(
-                person_ids
-            )
-            additional_films_by_genre = pg_fetcher.fetch_films_by_updated_genres(
-                genre_ids
-            )
-            # Merge all film works IDs
-            film_work_ids += [row[0] for row in additional_films_by_person] + [
-                row[0] for row in additional_films_by_genre
-            ]
-            film_work_ids = list(set(film_work_ids))
-            complete_film_data = pg_fetcher.merge_film_data(film_work_ids)
-            # Transform and load data
-            transformed_data = transform_to_json(complete_film_data)
-            es_loader.load_data(es_config.index, transformed_data)
-            # Ensure new_last_modified_* variables have values before updating state
-            if new_last_modified_person:
-                state_manager.set_state(
-                    "person_last_modified", new_last_modified_person
+            with profiler.iteration():
+                # Fetch updated records for film work into the direct lane
+                last_modified_film_work = direct_lane.get_watermark(
+                    "film_work_last_modified"
+                ) or state_manager.get_state("film_work_last_modified")
+                (
+                    updated_film_works_data,
+                    new_last_modified_film_work,
+                ) = pg_fetcher.fetch_updated_records(
+                    "film_work", last_modified_film_work
                 )
-            if new_last_modified_genre:
-                state_manager.set_state("genre_last_modified", new_last_modified_genre)
-            if new_last_modified_film_work:
-                state_manager.set_state(
-                    "film_work_last_modified", new_last_modified_film_work
+                direct_lane.add(
+                    [row[0] for row in updated_film_works_data],
+                    {"film_work_last_modified": new_last_modified_film_work},
+                    [row.updated_at for row in updated_film_works_data],
                 )
-            if (
-                not updated_persons_data
-                and not updated_genres_data
-                and not updated_film_works_data
-            ):
-                logger.info("no new data to process")
-                time.sleep(1)
+                # Fetch updated person and genre records into the cascade lane,
+                # only once its backlog fits into a single batch
+                updated_persons_data, updated_genres_data = [], []
+                if cascade_lane.backlog < cascade_lane.batch_size:
+                    last_modified_person = cascade_lane.get_watermark(
+                        "person_last_modified"
+                    ) or state_manager.get_state("person_last_modified")
+                    (
+                        updated_persons_data,
+                        new_last_modified_person,
+                    ) = pg_fetcher.fetch_updated_records("person", last_modified_person)
+                    person_ids = [row[0] for row in updated_persons_data]
+                    last_modified_genre = cascade_lane.get_watermark(
+                        "genre_last_modified"
+                    ) or state_manager.get_state("genre_last_modified")
+                    (
+                        updated_genres_data,
+                        new_last_modified_genre,
+                    ) = pg_fetcher.fetch_updated_records("genre", last_modified_genre)
+                    genre_ids = [row[0] for row in updated_genres_data]
+                    # Additional related movies by person and genre
+                    additional_films_by_person = (
+                        pg_fetcher.fetch_films_by_updated_persons(person_ids)
+                    )
+                    additional_films_by_genre = (
+                        pg_fetcher.fetch_films_by_updated_genres(genre_ids)
+                    )
+                    cascade_lane.add(
+                        [row[0] for row in additional_films_by_person]
+                        + [row[0] for row in additional_films_by_genre],
+                        {
+                            "person_last_modified": new_last_modified_person,
+                            "genre_last_modified": new_last_modified_genre,
+                        },
+                        [row.updated_at for row in updated_persons_data]
+                        + [row.updated_at for row in updated_genres_data],
+                    )
+                # Direct lane goes first; each lane loads at most its batch budget
+                for lane in (direct_lane, cascade_lane):
+                    if not lane.is_ready():
+                        continue
+                    flush_lane(
+                        lane,
+                        pg_fetcher,
+                        es_loader,
+                        state_manager,
+                        profiler,
+                        es_config.index,
+                    )
+                if (
+                    not updated_persons_data
+                    and not updated_genres_data
+                    and not updated_film_works_data
+                    and not cascade_lane.backlog
+                ):
+                    logger.info("no new data to process")
         except Exception as e:
             logger.error("ETL process encountered an error: %s", e)
 
-        time.sleep(1)
+        time.sleep(app_settings.poll_interval)
@@ -1,4 +1,5 @@
 import logging
+from collections.abc import Iterator
 from datetime import date
 from time import sleep
 
@@ -15,6 +16,42 @@ from config.settings import PostgresSettings, app_settings
 logging.basicConfig(level=app_settings.log_level.upper())
 logger = logging.getLogger(__name__)
 
+# Columns of the aggregated film rows. The casts pin the types declared
+# for binary COPY, so both extraction paths return identical values.
+FILM_DATA_COLUMNS = """
+    fw.id AS fw_id,
+    fw.title::text AS title,
+    fw.description::text AS description,
+    fw.rating::float8 AS rating,
+    fw.type::text AS type,
+    fw.created_at::timestamptz AS created_at,
+    fw.updated_at::timestamptz AS updated_at,
+    pfw.role::text AS role,
+    p.id AS id,
+    p.full_name::text AS full_name,
+    g.name::text AS name
+"""
+FILM_DATA_TYPES = [
+    "uuid",
+    "text",
+    "text",
+    "float8",
+    "text",
+    "timestamptz",
+    "timestamptz",
+    "text",
+    "uuid",
+    "text",
+    "text",
+]
+FILM_DATA_JOINS = """
+    FROM content.film_work fw
+    LEFT JOIN content.person_film_work pfw ON pfw.film_work_id = fw.id
+    LEFT JOIN content.person p ON p.id = pfw.person_id
+    LEFT JOIN content.genre_film_work gfw ON gfw.film_work_id = fw.id
+    LEFT JOIN content.genre g ON g.id = gfw.genre_id
+"""
+
 
 class PostgresFetcher:
     """
@@ -166,12 +203,15 @@ class PostgresFetcher:
         )
         return rows, str(rows[-1].updated_at) if rows else None
 
-    def fetch_films_by_updated_persons(self, person_ids: list) -> list:
+    def fetch_films_by_updated_persons(
+        self, person_ids: list, limit: int | None = None
+    ) -> list:
         """
         Fetches films related to the given person IDs.
 
         Args:
             person_ids (list): A list of person IDs to fetch related films.
+            limit (int, optional): Maximum number of films to return. All related films by default.
 
         Returns:
             list: A list of tuples containing film IDs and their updated timestamps.
@@ -180,7 +220,6 @@ class PostgresFetcher:
         if not person_ids:
             return []
 
-        limit = self.limit
         formatted_person_ids = ", ".join(f"'{person_id}'" for person_id in person_ids)
         query = f"""
         SELECT fw.id, fw.updated_at
@@ -196,12 +235,15 @@ class PostgresFetcher:
         logger.debug("Fetched %d related films for persons from PostgreSQL", len(rows))
         return rows
 
-    def fetch_films_by_updated_genres(self, genre_ids: list) -> list:
+    def fetch_films_by_updated_genres(
+        self, genre_ids: list, limit: int | None = None
+    ) -> list:
         """
         Fetches films related to the updated genres.
 
         Args:
             genre_ids (list): A list of genre IDs to fetch related films.
+            limit (int, optional): Maximum number of films to return. All related films by default.
 
         Returns:
             list: A list of tuples containing film IDs and their updated timestamps.
@@ -210,7 +252,6 @@ class PostgresFetcher:
         if not genre_ids:
             return []
 
-        limit = self.limit
         formatted_genre_ids = ", ".join(f"'{genre_id}'" for genre_id in genre_ids)
         query = f"""
         SELECT fw.id, fw.updated_at
@@ -247,23 +288,8 @@ class PostgresFetcher:
             f"'{film_work_id}'" for film_work_id in film_work_ids
         )
         query = f"""
-        SELECT
-            fw.id as fw_id, 
-            fw.title, 
-            fw.description, 
-            fw.rating, 
-            fw.type, 
-            fw.created_at, 
-            fw.updated_at, 
-            pfw.role, 
-            p.id, 
-            p.full_name,
-            g.name
-        FROM content.film_work fw
-        LEFT JOIN content.person_film_work pfw ON pfw.film_work_id = fw.id
-        LEFT JOIN content.person p ON p.id = pfw.person_id
-        LEFT JOIN content.genre_film_work gfw ON gfw.film_work_id = fw.id
-        LEFT JOIN content.genre g ON g.id = gfw.genre_id
+        SELECT {FILM_DATA_COLUMNS}
+        {FILM_DATA_JOINS}
         WHERE fw.id IN ({formatted_film_work_ids});
         """
         self.execute_query(query)
@@ -271,3 +297,57 @@ class PostgresFetcher:
         # logger.debug(rows)
         logger.debug("Fetched %d complete film records from PostgreSQL", len(rows))
         return rows
+
+    def copy_film_data(self, chunk_size: int | None = None) -> Iterator[list[tuple]]:
+        """
+        Streams aggregated data of all films using binary COPY.
+
+        Meant for backfills: rows are decoded by psycopg straight into plain
+        tuples with declared types instead of being fetched through the cursor.
+        Rows are ordered by film, so every chunk holds complete films.
+        Database errors reconnect like execute_query and are raised, so the
+        backfill has to be started again.
+
+        Args:
+            chunk_size (int, optional): Maximum number of films per chunk. Defaults to the batch size.
+
+        Yields:
+            list: Rows of aggregated film data in the column order of merge_film_data.
+        """
+        chunk_size = chunk_size or self.limit
+        query = f"""
+        COPY (
+            SELECT {FILM_DATA_COLUMNS}
+            {FILM_DATA_JOINS}
+            ORDER BY fw.id
+        ) TO STDOUT (FORMAT BINARY)
+        """
+        logger.debug("Query: %s", query)
+        chunk: list[tuple] = []
+        films = 0
+        last_film_id = None
+        total = 0
+        try:
+            with self.cursor.copy(query) as copy:
+                copy.set_types(FILM_DATA_TYPES)
+                for row in copy.rows():
+                    if row[0] != last_film_id:
+                        if films == chunk_size:
+                            total += len(chunk)
+                            yield chunk
+                            chunk, films = [], 0
+                        films += 1
+                        last_film_id = row[0]
+                    chunk.append(row)
+        except (OperationalError, InterfaceError, DatabaseError) as e:
+            logger.error("Database error: %s", e)
+            self.handle_db_disconnection()
+            self.backoff_retry()
+            raise
+        except Exception as e:
+            logger.error("COPY failed: %s", e)
+            raise
+        if chunk:
+            total += len(chunk)
+            yield chunk
+        logger.debug("Copied %d complete film records from PostgreSQL", total)
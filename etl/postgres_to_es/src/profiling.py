@@ -0,0 +1,159 @@
+import cProfile
+import logging
+import os
+import signal
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+from config.settings import app_settings, ProfilingSettings
+
+logging.basicConfig(level=app_settings.log_level.upper())
+logger = logging.getLogger(__name__)
+
+_DISABLED = nullcontext()
+
+
+class Profiler:
+    """
+    On-demand profiler for the ETL loop.
+
+    A capture covers the next N iterations: it records a cProfile of them and
+    a tracemalloc snapshot diff around the spans marked with trace_memory,
+    and writes both to a new directory under the output directory. A capture
+    is started at launch or by sending SIGUSR1 to the process. Span timings
+    are logged per iteration when enabled. While neither is active, the
+    context managers are no-ops.
+
+    Attributes:
+        output_dir (str): Directory where captures are written.
+        iterations (int): Number of iterations covered by one capture.
+        spans_enabled (bool): Whether span timings are logged.
+        remaining (int): Iterations left in the current capture.
+    """
+
+    def __init__(self, config: ProfilingSettings) -> None:
+        """
+        Initializes the Profiler and installs the signal handler.
+
+        Args:
+            config (ProfilingSettings): The profiling configuration.
+        """
+        self.output_dir = config.output_dir
+        self.iterations = config.iterations
+        self.spans_enabled = config.spans
+        self.memory_top = config.memory_top
+        self.remaining = config.iterations if config.on_start else 0
+        self._profile: cProfile.Profile | None = None
+        self._capture_dir: str | None = None
+        self._captures = 0
+        self._iteration = 0
+        self._spans: dict[str, float] = {}
+        if config.on_signal and hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, self._handle_signal)
+
+    def _handle_signal(self, signum, frame) -> None:
+        self.remaining = self.iterations
+
+    @property
+    def capturing(self) -> bool:
+        return self.remaining > 0
+
+    def iteration(self):
+        """
+        Wraps one iteration of the ETL loop.
+
+        Returns:
+            A context manager profiling the iteration, or a no-op one when profiling is off.
+        """
+        if not self.capturing and not self.spans_enabled:
+            return _DISABLED
+        return self._run_iteration()
+
+    def span(self, name: str, trace_memory: bool = False):
+        """
+        Wraps one step of an iteration.
+
+        Args:
+            name (str): Name of the step.
+            trace_memory (bool): Whether to diff tracemalloc snapshots around the step during a capture.
+
+        Returns:
+            A context manager measuring the step, or a no-op one when profiling is off.
+        """
+        if not self.capturing and not self.spans_enabled:
+            return _DISABLED
+        return self._run_span(name, trace_memory and self._profile is not None)
+
+    @contextmanager
+    def _run_iteration(self):
+        capturing = self.capturing
+        if capturing:
+            if self._profile is None:
+                self._start_capture()
+            self._profile.enable()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if capturing:
+                self._profile.disable()
+                self._iteration += 1
+                self.remaining -= 1
+                if self.remaining <= 0:
+                    self._finish_capture()
+            if self.spans_enabled:
+                timings = ", ".join(
+                    f"{name}={duration * 1000:.1f}ms"
+                    for name, duration in self._spans.items()
+                )
+                logger.info("Iteration took %.1fms (%s)", elapsed * 1000, timings)
+            self._spans = {}
+
+    @contextmanager
+    def _run_span(self, name: str, trace_memory: bool):
+        before = tracemalloc.take_snapshot() if trace_memory else None
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._spans[name] = (
+                self._spans.get(name, 0.0) + time.perf_counter() - started
+            )
+            if before is not None:
+                self._write_memory_diff(name, before, tracemalloc.take_snapshot())
+
+    def _start_capture(self) -> None:
+        # Microseconds and a counter keep captures started in the same second apart
+        self._captures += 1
+        self._capture_dir = os.path.join(
+            self.output_dir,
+            f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{self._captures}",
+        )
+        os.makedirs(self._capture_dir)
+        self._profile = cProfile.Profile()
+        self._iteration = 0
+        tracemalloc.start()
+        logger.info(
+            "Profiling the next %d iterations into %s",
+            self.remaining,
+            self._capture_dir,
+        )
+
+    def _finish_capture(self) -> None:
+        path = os.path.join(self._capture_dir, "iterations.prof")
+        self._profile.dump_stats(path)
+        self._profile = None
+        tracemalloc.stop()
+        logger.info("Profiling finished, results written to %s", self._capture_dir)
+
+    def _write_memory_diff(
+        self, name: str, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot
+    ) -> None:
+        stats = after.compare_to(before, "lineno")[: self.memory_top]
+        path = os.path.join(self._capture_dir, f"{name}-{self._iteration}.txt")
+        with open(path, "w") as file:
+            for stat in stats:
+                file.write(f"{stat}\n")
@@ -0,0 +1,54 @@
+import logging
+
+from config.settings import (
+    postgres_settings,
+    elasticsearch_settings,
+    state_settings,
+    dead_letter_settings,
+    app_settings,
+)
+from dead_letter import create_dead_letter_queue
+from elasticsearch_loader import ElasticsearchLoader
+from postgres_fetcher import PostgresFetcher
+from transform import transform_to_json
+
+
+logging.basicConfig(level=app_settings.log_level.upper())
+logger = logging.getLogger(__name__)
+
+if __name__ == "__main__":
+    dead_letter_queue = create_dead_letter_queue(
+        dead_letter_settings, state_settings.redis_storage
+    )
+    total = len(dead_letter_queue)
+    logger.info("Replaying %d dead-letter entries...", total)
+    pg_fetcher = PostgresFetcher(postgres_settings)
+    es_loader = ElasticsearchLoader(elasticsearch_settings, dead_letter_queue)
+    pg_fetcher.connect()
+
+    # Only the entries present at start are replayed, so documents failing
+    # again are re-queued by the loader instead of being retried forever.
+    # Entries are acknowledged only after their batch has reached Elasticsearch.
+    remaining = total
+    while remaining > 0:
+        entries = dead_letter_queue.peek(
+            min(dead_letter_settings.replay_batch_size, remaining)
+        )
+        if not entries:
+            break
+        film_work_ids = list({entry["id"] for entry in entries})
+        # Rebuild documents from the source so fixes to the data are picked up
+        complete_film_data = pg_fetcher.merge_film_data(film_work_ids)
+        transformed_data = transform_to_json(complete_film_data)
+        found_ids = {str(record["id"]) for record in transformed_data}
+        for film_work_id in film_work_ids:
+            if film_work_id not in found_ids:
+                logger.warning("Film %s no longer exists, dropping it", film_work_id)
+        if not es_loader.load_data(elasticsearch_settings.index, transformed_data):
+            logger.error("Replay stopped, %d entries kept in the queue", remaining)
+            break
+        dead_letter_queue.ack(len(entries))
+        remaining -= len(entries)
+
+    pg_fetcher.close()
+    logger.info("Dead-letter replay finished, %d entries left", len(dead_letter_queue))
@@ -12,7 +12,9 @@ def transform_to_json(rows: list[tuple[Any]]) -> list[dict[str, Any]]:
     Transforms data rows into JSON format suitable for Elasticsearch.
 
     Args:
-        rows (list): A list of rows containing film work data.
+        rows (list): A list of rows containing film work data, either named tuples
+            from the cursor or plain tuples from binary COPY, in the column order of
+            PostgresFetcher.merge_film_data.
 
     Returns:
         list: A list of dictionaries where each dictionary represents a film record in JSON format.
@@ -23,21 +25,29 @@ def transform_to_json(rows: list[tuple[Any]]) -> list[dict[str, Any]]:
     films = {}
 
     for row in rows:
-        film_id = row.fw_id
-        role = row.role
-        person_id = row.id
-        full_name = row.full_name
-        genre_name = row.name
+        (
+            film_id,
+            title,
+            description,
+            rating,
+            _,
+            _,
+            _,
+            role,
+            person_id,
+            full_name,
+            genre_name,
+        ) = row
 
         # Create a new movie record if it has not been added yet
         logger.debug("Processing film ID: %s", film_id)
         if film_id not in films:
             films[film_id] = {
                 "id": film_id,
-                "imdb_rating": row.rating,
+                "imdb_rating": rating,
                 "genre": [],
-                "title": row.title,
-                "description": row.description,
+                "title": title,
+                "description": description,
                 "actors_names": [],
                 "writers_names": [],
                 "actors": [],
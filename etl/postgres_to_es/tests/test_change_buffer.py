@@ -0,0 +1,36 @@
+from change_buffer import ChangeBuffer
+
+
+def test_add_deduplicates_in_order():
+    buffer = ChangeBuffer(window=0, max_size=10)
+
+    buffer.add(["a", "b"], {"film_work_last_modified": "t1"})
+    buffer.add(["b", "c"], {"film_work_last_modified": None})
+
+    assert buffer.drain() == (["a", "b", "c"], {"film_work_last_modified": "t1"})
+
+
+def test_is_ready_by_size_or_window():
+    assert not ChangeBuffer(window=0, max_size=10).is_ready()
+
+    by_size = ChangeBuffer(window=60, max_size=2)
+    by_size.add(["a"], {})
+    assert not by_size.is_ready()
+    by_size.add(["b"], {})
+    assert by_size.is_ready()
+
+    by_window = ChangeBuffer(window=0, max_size=10)
+    by_window.add(["a"], {})
+    assert by_window.is_ready()
+
+
+def test_watermarks_are_held_until_drained():
+    buffer = ChangeBuffer(window=60, max_size=10)
+    buffer.add([], {"person_last_modified": "t1"})
+    buffer.add(["a"], {"person_last_modified": "t2"})
+
+    # Change detection keeps reading from the buffered watermark
+    assert buffer.get_watermark("person_last_modified") == "t2"
+    assert buffer.drain() == (["a"], {"person_last_modified": "t2"})
+    assert buffer.get_watermark("person_last_modified") is None
+    assert not buffer.is_ready()
@@ -0,0 +1,37 @@
+import pytest
+
+from dead_letter import DeadLetterQueue, JsonLinesDeadLetterStorage
+
+
+@pytest.fixture()
+def dead_letter_queue(tmp_path):
+    return DeadLetterQueue(JsonLinesDeadLetterStorage(str(tmp_path / "dlq.jsonl")))
+
+
+def test_empty_queue(dead_letter_queue):
+    assert len(dead_letter_queue) == 0
+    assert dead_letter_queue.peek(10) == []
+
+
+def test_put_and_peek_keep_order(dead_letter_queue):
+    for film_id in ("a", "b", "c"):
+        dead_letter_queue.put("movies", {"id": film_id}, "mapping error", 400)
+
+    entries = dead_letter_queue.peek(2)
+
+    assert [entry["id"] for entry in entries] == ["a", "b"]
+    assert entries[0]["reason"] == "mapping error"
+    assert entries[0]["document"] == {"id": "a"}
+    assert len(dead_letter_queue) == 3
+
+
+def test_ack_removes_only_replayed_entries(dead_letter_queue):
+    dead_letter_queue.put("movies", {"id": "a"}, "mapping error", 400)
+    dead_letter_queue.put("movies", {"id": "b"}, "mapping error", 400)
+    entries = dead_letter_queue.peek(2)
+    # An entry pushed while the batch is being replayed must survive the ack
+    dead_letter_queue.put("movies", {"id": "c"}, "mapping error", 400)
+
+    dead_letter_queue.ack(len(entries))
+
+    assert [entry["id"] for entry in dead_letter_queue.peek(10)] == ["c"]
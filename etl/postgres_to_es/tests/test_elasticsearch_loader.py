@@ -0,0 +1,134 @@
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from elasticsearch import ApiError, ConnectionError, Elasticsearch
+
+import elasticsearch_loader
+from config.settings import ElasticsearchSettings
+from dead_letter import DeadLetterQueue, JsonLinesDeadLetterStorage
+from elasticsearch_loader import ElasticsearchLoader
+
+
+@pytest.fixture()
+def dead_letter_queue(tmp_path):
+    return DeadLetterQueue(JsonLinesDeadLetterStorage(str(tmp_path / "dlq.jsonl")))
+
+
+@pytest.fixture()
+def loader(dead_letter_queue, monkeypatch):
+    monkeypatch.setattr(elasticsearch_loader.time, "sleep", lambda _: None)
+    return ElasticsearchLoader(
+        ElasticsearchSettings(bulk_max_retries=1), dead_letter_queue
+    )
+
+
+@pytest.fixture()
+def documents():
+    return [{"id": uuid.uuid4(), "title": f"Film {i}"} for i in range(3)]
+
+
+def fake_bulk(monkeypatch, respond):
+    """
+    Replaces Elasticsearch.bulk with a stub answering through respond.
+
+    respond gets the call number and the document ids of the request and
+    returns a status per id, or raises an exception for the whole request.
+    """
+    calls = []
+
+    def bulk(self, *args, operations, **kwargs):
+        headers = [json.loads(line) for line in operations[::2]]
+        ids = [header["index"]["_id"] for header in headers]
+        calls.append(ids)
+        statuses = respond(len(calls), ids)
+        items = [
+            {"index": {"_id": doc_id, "status": statuses[doc_id], "error": "failed"}}
+            for doc_id in ids
+        ]
+        return SimpleNamespace(body={"errors": True, "items": items})
+
+    monkeypatch.setattr(Elasticsearch, "bulk", bulk)
+    return calls
+
+
+def test_permanent_error_is_dead_lettered(
+    loader, dead_letter_queue, documents, monkeypatch
+):
+    rejected = str(documents[0]["id"])
+    calls = fake_bulk(
+        monkeypatch,
+        lambda _, ids: {doc_id: 400 if doc_id == rejected else 201 for doc_id in ids},
+    )
+
+    assert loader.load_data("movies", documents)
+
+    assert len(calls) == 1
+    entries = dead_letter_queue.peek(10)
+    assert [entry["id"] for entry in entries] == [rejected]
+    assert entries[0]["status"] == 400
+    assert entries[0]["reason"] == "failed"
+
+
+def test_retryable_error_is_retried(loader, dead_letter_queue, documents, monkeypatch):
+    busy = str(documents[1]["id"])
+    calls = fake_bulk(
+        monkeypatch,
+        lambda call, ids: {
+            doc_id: 429 if doc_id == busy and call == 1 else 201 for doc_id in ids
+        },
+    )
+
+    assert loader.load_data("movies", documents)
+
+    assert calls[1] == [busy]
+    assert len(dead_letter_queue) == 0
+
+
+def test_retryable_error_holds_batch_after_retries(
+    loader, dead_letter_queue, documents, monkeypatch
+):
+    rejected = str(documents[0]["id"])
+    busy = str(documents[1]["id"])
+    calls = fake_bulk(
+        monkeypatch,
+        lambda _, ids: {
+            doc_id: 400 if doc_id == rejected else 503 if doc_id == busy else 201
+            for doc_id in ids
+        },
+    )
+
+    assert not loader.load_data("movies", documents)
+
+    assert len(calls) == 2
+    # The batch is loaded again, so its rejections are dead-lettered then
+    assert len(dead_letter_queue) == 0
+
+
+def test_rejected_request_is_retried_then_held(
+    loader, dead_letter_queue, documents, monkeypatch
+):
+    def respond(call, ids):
+        raise ApiError("unavailable", SimpleNamespace(status=503), None)
+
+    calls = fake_bulk(monkeypatch, respond)
+
+    assert not loader.load_data("movies", documents)
+
+    assert len(calls) == 2
+    assert len(dead_letter_queue) == 0
+
+
+def test_unreachable_cluster_holds_batch(
+    loader, dead_letter_queue, documents, monkeypatch
+):
+    def respond(call, ids):
+        raise ConnectionError("connection refused")
+
+    calls = fake_bulk(monkeypatch, respond)
+
+    assert not loader.load_data("movies", documents)
+
+    assert len(calls) == 1
+    assert len(dead_letter_queue) == 0
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+import main
+from change_buffer import ChangeBuffer
+from config.settings import ProfilingSettings
+from lanes import Lane
+from profiling import Profiler
+from state_manager import JsonFileStorage, State
+
+
+def test_drain_with_limit_holds_watermarks_until_empty():
+    buffer = ChangeBuffer(window=0, max_size=10)
+    buffer.add(["a", "b", "c"], {"genre_last_modified": "t1"})
+
+    assert buffer.drain(limit=2) == (["a", "b"], {})
+    assert buffer.get_watermark("genre_last_modified") == "t1"
+    assert buffer.drain(limit=2) == (["c"], {"genre_last_modified": "t1"})
+    assert len(buffer) == 0
+    assert buffer.get_watermark("genre_last_modified") is None
+
+
+def test_failed_batch_is_requeued():
+    lane = Lane("cascade", window=0, batch_size=2)
+    lane.add(["a", "b", "c"], {"genre_last_modified": "t1"}, [])
+
+    assert lane.take() == (["a", "b"], {})
+    # No done(): the load of the batch failed
+    assert lane.take() == (["c", "a"], {})
+    lane.done(2)
+    assert lane.take() == (["b"], {"genre_last_modified": "t1"})
+
+
+def test_lag_counts_from_oldest_uncommitted_change():
+    lane = Lane("cascade", window=0, batch_size=1)
+    changed_at = datetime.now(timezone.utc) - timedelta(seconds=30)
+    lane.add(["a", "b"], {"genre_last_modified": "t1"}, [changed_at])
+
+    lane.take()
+    lane.done(1)
+    assert lane.lag >= 30
+
+    # Later changes do not hide the backlog's oldest change
+    lane.add(["c"], {"genre_last_modified": "t2"}, [datetime.now(timezone.utc)])
+    lane.take()
+    lane.done(1)
+    assert lane.lag >= 30
+
+
+def test_batch_failing_to_load_is_retried_before_committing(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "transform_to_json", lambda rows: rows)
+    lane = Lane("cascade", window=0, batch_size=2)
+    lane.add(["a", "b"], {"genre_last_modified": "t1"}, [])
+    state_manager = State(JsonFileStorage(str(tmp_path / "state.json")))
+    pg_fetcher = SimpleNamespace(
+        merge_film_data=lambda ids: [{"id": film_work_id} for film_work_id in ids]
+    )
+    loads = []
+    results = iter([False, True])
+
+    def load_data(index, data):
+        loads.append([record["id"] for record in data])
+        return next(results)
+
+    flush = [
+        lane,
+        pg_fetcher,
+        SimpleNamespace(load_data=load_data),
+        state_manager,
+        Profiler(ProfilingSettings(on_signal=False)),
+        "movies",
+    ]
+
+    with pytest.raises(RuntimeError):
+        main.flush_lane(*flush)
+    assert state_manager.get_state("genre_last_modified") is None
+    assert lane.is_ready()
+
+    main.flush_lane(*flush)
+    assert loads == [["a", "b"], ["a", "b"]]
+    assert state_manager.get_state("genre_last_modified") == "t1"
+    assert not lane.is_ready()
@@ -0,0 +1,70 @@
+from contextlib import contextmanager
+
+import pytest
+from psycopg import OperationalError
+
+from config.settings import PostgresSettings
+from postgres_fetcher import PostgresFetcher
+
+
+class FakeCopy:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def set_types(self, types):
+        pass
+
+    def rows(self):
+        for row in self._rows:
+            if isinstance(row, Exception):
+                raise row
+            yield row
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self._rows = rows
+
+    @contextmanager
+    def copy(self, query):
+        yield FakeCopy(self._rows)
+
+
+@pytest.fixture()
+def fetcher():
+    return PostgresFetcher(PostgresSettings())
+
+
+def test_copy_keeps_films_whole_and_flushes_last_chunk(fetcher):
+    # Several rows per film, as produced by the person and genre joins
+    fetcher.cursor = FakeCursor(
+        [("a", 1), ("a", 2), ("b", 1), ("c", 1), ("c", 2), ("c", 3), ("d", 1)]
+    )
+
+    chunks = list(fetcher.copy_film_data(chunk_size=2))
+
+    assert chunks == [
+        [("a", 1), ("a", 2), ("b", 1)],
+        [("c", 1), ("c", 2), ("c", 3), ("d", 1)],
+    ]
+
+
+def test_copy_yields_a_partial_last_chunk(fetcher):
+    fetcher.cursor = FakeCursor([("a", 1), ("b", 1), ("c", 1), ("c", 2)])
+
+    chunks = list(fetcher.copy_film_data(chunk_size=2))
+
+    assert chunks == [[("a", 1), ("b", 1)], [("c", 1), ("c", 2)]]
+
+
+def test_copy_reconnects_on_database_error(fetcher, monkeypatch):
+    fetcher.cursor = FakeCursor([("a", 1), OperationalError("server closed")])
+    fetcher.conn = type("Connection", (), {"close": lambda self: None})()
+    reconnects = []
+    monkeypatch.setattr(fetcher, "backoff_retry", lambda: reconnects.append(True))
+
+    with pytest.raises(OperationalError):
+        list(fetcher.copy_film_data(chunk_size=2))
+
+    assert reconnects == [True]
+    assert fetcher.conn is None
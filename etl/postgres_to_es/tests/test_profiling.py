@@ -0,0 +1,64 @@
+import os
+import tracemalloc
+
+import pytest
+
+import profiling
+from config.settings import ProfilingSettings
+from profiling import Profiler
+
+
+@pytest.fixture()
+def profiler(tmp_path):
+    return Profiler(
+        ProfilingSettings(output_dir=str(tmp_path), iterations=2, on_signal=False)
+    )
+
+
+def run_iteration(profiler):
+    with profiler.iteration():
+        with profiler.span("cascade.transform_to_json", trace_memory=True):
+            [str(i) for i in range(1000)]
+        with profiler.span("cascade.load_data"):
+            pass
+
+
+def test_idle_profiler_returns_shared_no_op(profiler):
+    assert profiler.iteration() is profiling._DISABLED
+    assert profiler.span("cascade.load_data", trace_memory=True) is (
+        profiling._DISABLED
+    )
+
+
+def test_signal_starts_capture(profiler):
+    profiler._handle_signal(None, None)
+
+    assert profiler.capturing
+    assert profiler.iteration() is not profiling._DISABLED
+
+
+def test_capture_writes_results_and_stops(profiler, tmp_path):
+    profiler._handle_signal(None, None)
+
+    run_iteration(profiler)
+    assert tracemalloc.is_tracing()
+    run_iteration(profiler)
+
+    assert not profiler.capturing
+    assert not tracemalloc.is_tracing()
+    [capture_dir] = os.listdir(tmp_path)
+    assert sorted(os.listdir(tmp_path / capture_dir)) == [
+        "cascade.transform_to_json-0.txt",
+        "cascade.transform_to_json-1.txt",
+        "iterations.prof",
+    ]
+    assert profiler.iteration() is profiling._DISABLED
+
+
+def test_captures_in_the_same_second_get_own_directories(profiler, tmp_path):
+    for _ in range(2):
+        profiler._handle_signal(None, None)
+        run_iteration(profiler)
+        run_iteration(profiler)
+
+    assert len(os.listdir(tmp_path)) == 2